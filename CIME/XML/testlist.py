@@ -108,12 +108,14 @@ class Testlist(GenericXML):
                     else:
                         this_test_node[key] = value
 
-                # Get options that apply to all machines/compilers for this test
+                # Get options that apply to all machines/compilers for this test,
+                # these are read once and copied for each machine
+                test_options = {}
                 options = self.get_children("options", root=tnode)
                 if len(options) > 0:
-                    optionnodes = self.get_children("option", root=options[0])
-                else:
-                    optionnodes = []
+                    for onode in self.get_children("option", root=options[0]):
+                        test_options[self.get(onode, "name")] = self.text(onode)
+
                 for mach in machnodes:
                     # this_test_node can include multiple tests
                     this_test = dict(this_test_node)
@@ -122,10 +124,7 @@ class Testlist(GenericXML):
                             this_test["machine"] = value
                         else:
                             this_test[key] = value
-                    this_test["options"] = {}
-
-                    for onode in optionnodes:
-                        this_test["options"][self.get(onode, "name")] = self.text(onode)
+                    this_test["options"] = dict(test_options)
 
                     # Now get options specific to this machine/compiler
                     options = self.get_optional_child("options", root=mach)
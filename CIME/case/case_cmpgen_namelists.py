@@ -11,11 +11,46 @@ from CIME.utils import append_status, safe_copy, SharedArea
 from CIME.test_status import *
 
 import os, shutil, traceback, stat, glob
-from distutils import dir_util
 
 logger = logging.getLogger(__name__)
 
 
+def _list_dir(path):
+    """
+    Return the entries of directory path, or nothing if it does not exist
+    """
+    try:
+        with os.scandir(path) as entries:
+            return list(entries)
+    except FileNotFoundError:
+        return []
+
+
+def _copy_tree(src, dst):
+    """
+    Copy the contents of directory src into dst. Only file data is copied, so
+    permissions come from the current umask (see SharedArea). shutil.copyfile
+    lets the kernel copy the data instead of a python read/write loop.
+    """
+    os.makedirs(dst, exist_ok=True)
+    with os.scandir(src) as entries:
+        for entry in entries:
+            tgt = os.path.join(dst, entry.name)
+            if entry.is_dir():
+                _copy_tree(entry.path, tgt)
+            else:
+                shutil.copyfile(entry.path, tgt)
+
+
+def _compare_one(item, baseline_counterpart, test):
+    if item.endswith("runconfig") or item.endswith("runseq"):
+        return compare_runconfigfiles(baseline_counterpart, item, test)
+    elif is_namelist_file(item):
+        return compare_namelist_files(baseline_counterpart, item, test)
+    else:
+        return compare_files(baseline_counterpart, item, test)
+
+
 def _do_full_nl_comp(case, test, compare_name, baseline_root=None):
     test_dir = case.get_value("CASEROOT")
     casedoc_dir = os.path.join(test_dir, "CaseDocs")
@@ -30,38 +65,25 @@ def _do_full_nl_comp(case, test, compare_name, baseline_root=None):
     # Start off by comparing everything in CaseDocs except a few arbitrary files (ugh!)
     # TODO: Namelist files should have consistent suffix
     all_items_to_compare = [
-        item
-        for item in glob.glob("{}/*".format(casedoc_dir))
-        if "README" not in os.path.basename(item)
-        and not item.endswith("doc")
-        and not item.endswith("prescribed")
-        and not os.path.basename(item).startswith(".")
+        entry.path
+        for entry in _list_dir(casedoc_dir)
+        if "README" not in entry.name
+        and not entry.name.endswith("doc")
+        and not entry.name.endswith("prescribed")
+        and not entry.name.startswith(".")
     ]
 
+    # One directory listing instead of a stat per item
+    baseline_items = set(entry.name for entry in _list_dir(baseline_casedocs))
+
     comments = "NLCOMP\n"
     for item in all_items_to_compare:
-        baseline_counterpart = os.path.join(
-            baseline_casedocs
-            if os.path.dirname(item).endswith("CaseDocs")
-            else baseline_dir,
-            os.path.basename(item),
-        )
-        if not os.path.exists(baseline_counterpart):
+        baseline_counterpart = os.path.join(baseline_casedocs, os.path.basename(item))
+        if os.path.basename(item) not in baseline_items:
             comments += "Missing baseline namelist '{}'\n".format(baseline_counterpart)
             all_match = False
         else:
-            if item.endswith("runconfig") or item.endswith("runseq"):
-                success, current_comments = compare_runconfigfiles(
-                    baseline_counterpart, item, test
-                )
-            elif is_namelist_file(item):
-                success, current_comments = compare_namelist_files(
-                    baseline_counterpart, item, test
-                )
-            else:
-                success, current_comments = compare_files(
-                    baseline_counterpart, item, test
-                )
+            success, current_comments = _compare_one(item, baseline_counterpart, test)
 
             all_match &= success
             if not success:
@@ -85,20 +107,23 @@ def _do_full_nl_gen_impl(case, test, generate_name, baseline_root=None):
     baseline_dir = os.path.join(baseline_root, generate_name, test)
     baseline_casedocs = os.path.join(baseline_dir, "CaseDocs")
 
-    if not os.path.isdir(baseline_dir):
-        os.makedirs(
-            baseline_dir, stat.S_IRWXU | stat.S_IRWXG | stat.S_IXOTH | stat.S_IROTH
-        )
+    os.makedirs(
+        baseline_dir,
+        stat.S_IRWXU | stat.S_IRWXG | stat.S_IXOTH | stat.S_IROTH,
+        exist_ok=True,
+    )
 
     if os.path.isdir(baseline_casedocs):
         shutil.rmtree(baseline_casedocs)
 
-    dir_util.copy_tree(casedoc_dir, baseline_casedocs, preserve_mode=False)
+    _copy_tree(casedoc_dir, baseline_casedocs)
 
     for item in glob.glob(os.path.join(test_dir, "user_nl*")):
         preexisting_baseline = os.path.join(baseline_dir, os.path.basename(item))
-        if os.path.exists(preexisting_baseline):
+        try:
             os.remove(preexisting_baseline)
+        except FileNotFoundError:
+            pass
 
         safe_copy(item, baseline_dir, preserve_meta=False)
 
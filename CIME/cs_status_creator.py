@@ -5,7 +5,6 @@ Creates a test suite-specific cs.status file from a template
 from CIME.XML.standard_module_setup import *
 import CIME.utils
 import os
-import stat
 
 
 def create_cs_status(test_root, test_id, extra_args="", filename=None):
@@ -29,20 +28,18 @@ def create_cs_status(test_root, test_id, extra_args="", filename=None):
     tools_path = os.path.join(cime_root, "CIME", "Tools")
     template_path = CIME.utils.get_template_path()
     template_file = os.path.join(template_path, "cs.status.template")
-    template = open(template_file, "r").read()
-    template = (
-        template.replace("<PATH>", tools_path)
-        .replace("<EXTRA_ARGS>", extra_args)
-        .replace("<TESTID>", test_id)
-        .replace("<TESTROOT>", test_root)
+    template = CIME.utils.fill_template(
+        CIME.utils.read_template(template_file),
+        {
+            "PATH": tools_path,
+            "EXTRA_ARGS": extra_args,
+            "TESTID": test_id,
+            "TESTROOT": test_root,
+        },
     )
     if not os.path.exists(test_root):
         os.makedirs(test_root)
     if filename is None:
         filename = "cs.status.{}".format(test_id)
     cs_status_file = os.path.join(test_root, filename)
-    with open(cs_status_file, "w") as fd:
-        fd.write(template)
-    os.chmod(
-        cs_status_file, os.stat(cs_status_file).st_mode | stat.S_IXUSR | stat.S_IXGRP
-    )
+    CIME.utils.write_executable(cs_status_file, template)
@@ -212,20 +212,24 @@ def _hists_match(model, hists1, hists2, suffix1="", suffix2=""):
 
             normalized.append(normalized_name)
 
-    set_of_1_not_2 = set(normalized1) - set(normalized2)
-    set_of_2_not_1 = set(normalized2) - set(normalized1)
+    # normalized name -> first hist with that name
+    first_hist1, first_hist2 = {}, {}
+    for hists, normalized, first_hist in [
+        (hists1, normalized1, first_hist1),
+        (hists2, normalized2, first_hist2),
+    ]:
+        for hist, normalized_name in zip(hists, normalized):
+            first_hist.setdefault(normalized_name, hist)
 
-    one_not_two = sorted([hists1[normalized1.index(item)] for item in set_of_1_not_2])
-    two_not_one = sorted([hists2[normalized2.index(item)] for item in set_of_2_not_1])
+    set_of_1_not_2 = first_hist1.keys() - first_hist2.keys()
+    set_of_2_not_1 = first_hist2.keys() - first_hist1.keys()
 
-    both = set(normalized1) & set(normalized2)
+    one_not_two = sorted([first_hist1[item] for item in set_of_1_not_2])
+    two_not_one = sorted([first_hist2[item] for item in set_of_2_not_1])
 
-    match_ups = sorted(
-        [
-            (hists1[normalized1.index(item)], hists2[normalized2.index(item)])
-            for item in both
-        ]
-    )
+    both = first_hist1.keys() & first_hist2.keys()
+
+    match_ups = sorted([(first_hist1[item], first_hist2[item]) for item in both])
 
     # Special case - comparing multiinstance to single instance files
 
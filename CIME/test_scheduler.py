@@ -9,8 +9,10 @@ they can be run outside the context of TestScheduler.
 """
 
 import os
-import traceback, stat, threading, time, glob
+import traceback, threading, time, heapq
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from queue import SimpleQueue
 
 from CIME.XML.standard_module_setup import *
 from CIME.get_tests import get_recommended_test_time, get_build_groups, is_perf_test
@@ -26,6 +28,9 @@ from CIME.utils import (
     get_src_root,
     get_tools_path,
     get_template_path,
+    read_template,
+    fill_template,
+    write_executable,
     get_project,
     get_timestamp,
     get_cime_default_driver,
@@ -62,6 +67,12 @@ PHASES = [
     RUN_PHASE,
 ]  # Order matters
 
+# Number of times to retry a phase command that hit a "bad interpreter" error
+_MAX_INTERPRETER_RETRIES = 3
+
+# Statuses that let a test go on to its next phase
+_CONTINUE_STATUSES = frozenset([TEST_PASS_STATUS, TEST_PEND_STATUS])
+
 ###############################################################################
 def _translate_test_names_for_new_pecount(test_names, force_procs, force_threads):
     ###############################################################################
@@ -213,6 +224,13 @@ class TestScheduler(object):
     ):
         ###########################################################################
         self._cime_root = get_cime_root()
+        self._src_root = get_src_root()
+        self._tools_path = get_tools_path()
+        # PYTHONPATH for the case scripts run by the phases
+        self._pythonpath = "{}:{}".format(self._cime_root, self._tools_path)
+        self._create_newcase_script = os.path.join(
+            self._cime_root, "CIME", "scripts", "create_newcase.py"
+        )
         self._cime_model = get_model()
         self._cime_driver = get_cime_default_driver()
         self._save_timing = save_timing
@@ -328,6 +346,27 @@ class TestScheduler(object):
             else self._machobj.get_value("BASELINE_ROOT")
         )
 
+        # Machine settings used by every test, read once here rather than
+        # re-scanning the machines XML in each phase
+        self._memleak_tolerance = self._machobj.get_value(
+            "TEST_MEMLEAK_TOLERANCE", resolved=False
+        )
+        self._tput_tolerance = self._machobj.get_value(
+            "TEST_TPUT_TOLERANCE", resolved=False
+        )
+        self._cprnc = self._machobj.get_value("CCSM_CPRNC", resolved=False)
+        self._machine_name = self._machobj.get_machine_name()
+
+        # Names of tests whose phase just finished, filled by the worker threads
+        self._finished_tests = SimpleQueue()
+
+        # Pristine env_test.xml group elements for the default cime driver,
+        # read once here rather than from the worker threads
+        self._envtest_groups = self._get_envtest_groups(self._cime_driver)
+
+        # test-name -> TOTALPES, filled in the first time a test is ready to run
+        self._total_pes = {}
+
         if baseline_cmp_name or baseline_gen_name:
             if self._baseline_cmp_name:
                 full_baseline_dir = os.path.join(
@@ -369,8 +408,19 @@ class TestScheduler(object):
         # is atomic, so this should be fine to use without mutex.
         # name -> (phase, status)
         self._tests = OrderedDict()
+        # name -> parse_test_name(name), the phases only read these
+        self._parsed_tests = {}
+        # name -> case directory
+        self._test_dirs = {}
         for test_name in test_names:
             self._tests[test_name] = (TEST_START, TEST_PASS_STATUS)
+            self._parsed_tests[test_name] = parse_test_name(test_name)
+            self._test_dirs[test_name] = os.path.join(
+                self._test_root, self._get_case_id(test_name)
+            )
+
+        # name -> position in the suite, the order tests are started in
+        self._test_idx = {test: idx for idx, test in enumerate(self._tests)}
 
         # Oversubscribe by 1/4
         if proc_pool is None:
@@ -395,9 +445,23 @@ class TestScheduler(object):
         if self._no_run:
             self._phases.remove(RUN_PHASE)
 
+        # phase -> position in self._phases
+        self._phase_idx = {phase: idx for idx, phase in enumerate(self._phases)}
+
+        # phase -> method that runs it
+        self._phase_methods = {
+            CREATE_NEWCASE_PHASE: self._create_newcase_phase,
+            XML_PHASE: self._xml_phase,
+            SETUP_PHASE: self._setup_phase,
+            SHAREDLIB_BUILD_PHASE: self._sharedlib_build_phase,
+            MODEL_BUILD_PHASE: self._model_build_phase,
+            RUN_PHASE: self._run_phase,
+        }
+
         if use_existing:
             for test in self._tests:
-                with TestStatus(self._get_test_dir(test)) as ts:
+                test_dir = self._get_test_dir(test)
+                with TestStatus(test_dir) as ts:
                     if force_rebuild:
                         ts.set_status(SHAREDLIB_BUILD_PHASE, TEST_PEND_STATUS)
 
@@ -429,20 +493,17 @@ class TestScheduler(object):
                                             )
                                         )
 
-                logger.info(
-                    "Using existing test directory {}".format(self._get_test_dir(test))
-                )
+                logger.info("Using existing test directory {}".format(test_dir))
         else:
             # None of the test directories should already exist.
             for test in self._tests:
+                test_dir = self._get_test_dir(test)
                 expect(
-                    not os.path.exists(self._get_test_dir(test)),
+                    not os.path.exists(test_dir),
                     "Cannot create new case in directory '{}', it already exists."
-                    " Pick a different test-id".format(self._get_test_dir(test)),
-                )
-                logger.info(
-                    "Creating test directory {}".format(self._get_test_dir(test))
+                    " Pick a different test-id".format(test_dir),
                 )
+                logger.info("Creating test directory {}".format(test_dir))
 
         # Setup build groups
         if single_exe:
@@ -455,8 +516,12 @@ class TestScheduler(object):
 
         # Build group to exeroot map
         self._build_group_exeroots = {}
+        # Test to build group map
+        self._test_build_groups = {}
         for build_group in self._build_groups:
             self._build_group_exeroots[build_group] = None
+            for test_name in build_group:
+                self._test_build_groups[test_name] = build_group
 
         logger.debug("Build groups are:")
         for build_group in self._build_groups:
@@ -481,10 +546,9 @@ class TestScheduler(object):
     def _log_output(self, test, output):
         ###########################################################################
         test_dir = self._get_test_dir(test)
-        if not os.path.isdir(test_dir):
-            # Note: making this directory could cause create_newcase to fail
-            # if this is run before.
-            os.makedirs(test_dir)
+        # Note: making this directory could cause create_newcase to fail
+        # if this is run before.
+        os.makedirs(test_dir, exist_ok=True)
         append_testlog(output, caseroot=test_dir)
 
     ###########################################################################
@@ -503,7 +567,42 @@ class TestScheduler(object):
     ###########################################################################
     def _get_test_dir(self, test):
         ###########################################################################
-        return os.path.join(self._test_root, self._get_case_id(test))
+        return self._test_dirs[test]
+
+    ###########################################################################
+    def _get_drv_component(self, driver):
+        ###########################################################################
+        # Determine list of component classes that this coupler/driver knows how
+        # to deal with. This list follows the same order as compset longnames follow.
+        files = Files(comp_interface=driver)
+        ufs_driver = os.environ.get("UFS_DRIVER")
+        attribute = None
+        if ufs_driver:
+            attribute = {"component": ufs_driver}
+
+        drv_config_file = files.get_value("CONFIG_CPL_FILE", attribute=attribute)
+
+        if driver == "nuopc" and not os.path.exists(drv_config_file):
+            drv_config_file = files.get_value("CONFIG_CPL_FILE", {"component": "cpl"})
+        expect(
+            os.path.exists(drv_config_file),
+            "File {} not found, cime driver {}".format(drv_config_file, driver),
+        )
+
+        return Component(drv_config_file, "CPL")
+
+    ###########################################################################
+    def _get_envtest_groups(self, driver):
+        ###########################################################################
+        # Gather the env_test.xml entries from config_files and the driver
+        # config into a scratch envtest object and return copies of its groups
+        envtest = EnvTest(self._test_root)
+        envtest.add_elements_by_group(Files(comp_interface=driver), {}, "env_test.xml")
+        envtest.add_elements_by_group(
+            self._get_drv_component(driver), {}, "env_test.xml"
+        )
+
+        return [envtest.copy(group) for group in envtest.get_children("group")]
 
     ###########################################################################
     def _get_test_data(self, test):
@@ -514,16 +613,13 @@ class TestScheduler(object):
     ###########################################################################
     def _is_broken(self, test):
         ###########################################################################
-        status = self._get_test_status(test)
-        return status != TEST_PASS_STATUS and status != TEST_PEND_STATUS
+        return self._get_test_status(test) not in _CONTINUE_STATUSES
 
     ###########################################################################
     def _work_remains(self, test):
         ###########################################################################
         test_phase, test_status = self._get_test_data(test)
-        return (
-            test_status == TEST_PASS_STATUS or test_status == TEST_PEND_STATUS
-        ) and test_phase != self._phases[-1]
+        return test_status in _CONTINUE_STATUSES and test_phase != self._phases[-1]
 
     ###########################################################################
     def _get_test_status(self, test, phase=None):
@@ -533,8 +629,9 @@ class TestScheduler(object):
             return curr_status
         else:
             # Assume all future phases are PEND
-            if phase is not None and self._phases.index(phase) > self._phases.index(
-                curr_phase
+            if (
+                phase is not None
+                and self._phase_idx[phase] > self._phase_idx[curr_phase]
             ):
                 return TEST_PEND_STATUS
 
@@ -549,7 +646,7 @@ class TestScheduler(object):
     ###########################################################################
     def _update_test_status(self, test, phase, status):
         ###########################################################################
-        phase_idx = self._phases.index(phase)
+        phase_idx = self._phase_idx[phase]
         old_phase, old_status = self._get_test_data(test)
 
         if old_phase == phase:
@@ -569,7 +666,7 @@ class TestScheduler(object):
                 status == TEST_PEND_STATUS, "New phase should be set to pending status"
             )
             expect(
-                self._phases.index(old_phase) == phase_idx - 1,
+                self._phase_idx[old_phase] == phase_idx - 1,
                 "Skipped phase? {} {}".format(old_phase, phase_idx),
             )
 
@@ -580,8 +677,9 @@ class TestScheduler(object):
     def _shell_cmd_for_phase(self, test, cmd, phase, from_dir=None):
         ###########################################################################
         env = os.environ.copy()
-        env["PYTHONPATH"] = f"{get_cime_root()}:{get_tools_path()}"
+        env["PYTHONPATH"] = self._pythonpath
 
+        attempt = 0
         while True:
             rc, output, errput = run_cmd(cmd, from_dir=from_dir, env=env)
             if rc != 0:
@@ -593,8 +691,9 @@ class TestScheduler(object):
                 )
                 # Temporary hack to get around odd file descriptor use by
                 # buildnml scripts.
-                if "bad interpreter" in output:
-                    time.sleep(1)
+                if "bad interpreter" in output and attempt < _MAX_INTERPRETER_RETRIES:
+                    time.sleep(min(2**attempt, 8))
+                    attempt += 1
                     continue
                 else:
                     return False, errput
@@ -615,14 +714,20 @@ class TestScheduler(object):
         ###########################################################################
         test_dir = self._get_test_dir(test)
 
-        _, case_opts, grid, compset, machine, compiler, test_mods = parse_test_name(
-            test
-        )
+        (
+            test_case,
+            case_opts,
+            grid,
+            compset,
+            machine,
+            compiler,
+            test_mods,
+        ) = self._parsed_tests[test]
 
         os.environ["FROM_CREATE_TEST"] = "True"
         create_newcase_cmd = "{} {} --case {} --res {} --compset {} --test".format(
             sys.executable,
-            os.path.join(self._cime_root, "CIME", "scripts", "create_newcase.py"),
+            self._create_newcase_script,
             test_dir,
             grid,
             compset,
@@ -645,7 +750,7 @@ class TestScheduler(object):
         if self._pesfile is not None:
             create_newcase_cmd += " --pesfile {} ".format(self._pesfile)
 
-        create_newcase_cmd += f" --srcroot {get_src_root()}"
+        create_newcase_cmd += f" --srcroot {self._src_root}"
 
         mpilib = None
         ninst = 1
@@ -736,11 +841,8 @@ class TestScheduler(object):
         else:
             # We need to hard code the queue for this test on cheyenne
             # otherwise it runs in share and fails intermittently
-            test_case = parse_test_name(test)[0]
             if test_case == "NODEFAIL":
-                machine = (
-                    machine if machine is not None else self._machobj.get_machine_name()
-                )
+                machine = machine if machine is not None else self._machine_name
                 if machine == "cheyenne":
                     create_newcase_cmd += " --queue=regular"
 
@@ -778,41 +880,28 @@ class TestScheduler(object):
     ###########################################################################
     def _xml_phase(self, test):
         ###########################################################################
-        test_case, case_opts, _, _, _, compiler, _ = parse_test_name(test)
+        test_case, case_opts, _, _, _, compiler, _ = self._parsed_tests[test]
 
         # Create, fill and write an envtest object
         test_dir = self._get_test_dir(test)
         envtest = EnvTest(test_dir)
 
-        # Determine list of component classes that this coupler/driver knows how
-        # to deal with. This list follows the same order as compset longnames follow.
-        files = Files(comp_interface=self._cime_driver)
-        ufs_driver = os.environ.get("UFS_DRIVER")
-        attribute = None
-        if ufs_driver:
-            attribute = {"component": ufs_driver}
-
-        drv_config_file = files.get_value("CONFIG_CPL_FILE", attribute=attribute)
-
-        if self._cime_driver == "nuopc" and not os.path.exists(drv_config_file):
-            drv_config_file = files.get_value("CONFIG_CPL_FILE", {"component": "cpl"})
-        expect(
-            os.path.exists(drv_config_file),
-            "File {} not found, cime driver {}".format(
-                drv_config_file, self._cime_driver
-            ),
-        )
+        # The env_test.xml entries taken from config_files and the driver config
+        # are the same for every test using the default driver, copy the ones
+        # gathered in __init__ unless this test picked its own driver.
+        envtest_groups = self._envtest_groups
+        if case_opts is not None:
+            for case_opt in case_opts:  # pylint: disable=not-an-iterable
+                if case_opt.startswith("V"):
+                    envtest_groups = self._get_envtest_groups(case_opt[1:])
 
-        drv_comp = Component(drv_config_file, "CPL")
+        for group in envtest_groups:
+            envtest.add_child(envtest.copy(group))
 
-        envtest.add_elements_by_group(files, {}, "env_test.xml")
-        envtest.add_elements_by_group(drv_comp, {}, "env_test.xml")
         envtest.set_value("TESTCASE", test_case)
         envtest.set_value("TEST_TESTID", self._test_id)
         envtest.set_value("CASEBASEID", test)
-        memleak_tolerance = self._machobj.get_value(
-            "TEST_MEMLEAK_TOLERANCE", resolved=False
-        )
+        memleak_tolerance = self._memleak_tolerance
         if (
             test in self._test_data
             and "options" in self._test_data[test]
@@ -849,10 +938,8 @@ class TestScheduler(object):
         envtest.set_value("BASELINE_ROOT", self._baseline_root)
         envtest.set_value("GENERATE_BASELINE", self._baseline_gen_name is not None)
         envtest.set_value("COMPARE_BASELINE", self._baseline_cmp_name is not None)
-        envtest.set_value(
-            "CCSM_CPRNC", self._machobj.get_value("CCSM_CPRNC", resolved=False)
-        )
-        tput_tolerance = self._machobj.get_value("TEST_TPUT_TOLERANCE", resolved=False)
+        envtest.set_value("CCSM_CPRNC", self._cprnc)
+        tput_tolerance = self._tput_tolerance
         if (
             test in self._test_data
             and "options" in self._test_data[test]
@@ -1001,10 +1088,13 @@ class TestScheduler(object):
             test, "./case.setup", SETUP_PHASE, from_dir=test_dir
         )
 
-        # It's OK for this command to fail with baseline diffs but not catastrophically
+        # It's OK for this command to fail with baseline diffs but not catastrophically.
+        # It stays a subprocess: cmpgen_namelists changes the process umask
+        # (SharedArea) and logs to the console, neither of which is safe to do
+        # from the scheduler's worker threads.
         if rv[0]:
             env = os.environ.copy()
-            env["PYTHONPATH"] = f"{get_cime_root()}:{get_tools_path()}"
+            env["PYTHONPATH"] = self._pythonpath
             cmdstat, output, _ = run_cmd(
                 "./case.cmpgen_namelists",
                 combine_output=True,
@@ -1017,7 +1107,7 @@ class TestScheduler(object):
             )
 
         if self._single_exe:
-            with Case(self._get_test_dir(test), read_only=False) as case:
+            with Case(test_dir, read_only=False) as case:
                 tests = Tests()
 
                 try:
@@ -1055,11 +1145,10 @@ class TestScheduler(object):
     ###########################################################################
     def _get_build_group(self, test):
         ###########################################################################
-        for build_group in self._build_groups:
-            if test in build_group:
-                return test == build_group[0], build_group[0], build_group
+        build_group = self._test_build_groups.get(test)
+        expect(build_group is not None, "No build group for test '{}'".format(test))
 
-        expect(False, "No build group for test '{}'".format(test))
+        return test == build_group[0], build_group[0], build_group
 
     ###########################################################################
     def _model_build_phase(self, test):
@@ -1093,7 +1182,7 @@ class TestScheduler(object):
         ###########################################################################
         test_dir = self._get_test_dir(test)
 
-        case_opts = parse_test_name(test)[1]
+        case_opts = self._parsed_tests[test][1]
         if (
             case_opts is not None
             and "B" in case_opts  # pylint: disable=unsupported-membership-test
@@ -1152,9 +1241,16 @@ class TestScheduler(object):
                     return 1
 
         if phase == RUN_PHASE and (self._no_batch or no_batch):
-            test_dir = self._get_test_dir(test)
-            total_pes = EnvMachPes(test_dir, read_only=True).get_value("TOTALPES")
-            return total_pes
+            # The producer asks again on every pass while a test waits for procs,
+            # so only read env_mach_pes.xml once. This is not done right after
+            # SETUP since some system tests re-run case.setup during their build.
+            if test not in self._total_pes:
+                test_dir = self._get_test_dir(test)
+                self._total_pes[test] = EnvMachPes(test_dir, read_only=True).get_value(
+                    "TOTALPES"
+                )
+
+            return self._total_pes[test]
 
         elif phase == SHAREDLIB_BUILD_PHASE:
             if self._config.serialize_sharedlib_builds:
@@ -1176,19 +1272,18 @@ class TestScheduler(object):
     def _wait_for_something_to_finish(self, threads_in_flight):
         ###########################################################################
         expect(len(threads_in_flight) <= self._parallel_jobs, "Oversubscribed?")
-        finished_tests = []
-        while not finished_tests:
-            for test, thread_info in threads_in_flight.items():
-                if not thread_info[0].is_alive():
-                    finished_tests.append((test, thread_info[1]))
-
-            if not finished_tests:
-                time.sleep(0.2)
-
-        for finished_test, procs_needed in finished_tests:
-            self._procs_avail += procs_needed
+        # Block until a worker reports back, then collect anything else that
+        # finished in the meantime
+        finished_tests = [self._finished_tests.get()]
+        while not self._finished_tests.empty():
+            finished_tests.append(self._finished_tests.get_nowait())
+
+        for finished_test in finished_tests:
+            self._procs_avail += threads_in_flight[finished_test][1]
             del threads_in_flight[finished_test]
 
+        return finished_tests
+
     ###########################################################################
     def _update_test_status_file(self, test, test_phase, status):
         ###########################################################################
@@ -1203,9 +1298,10 @@ class TestScheduler(object):
     ###########################################################################
     def _consumer(self, test, test_phase, phase_method):
         ###########################################################################
-        before_time = time.time()
+        test_dir = self._get_test_dir(test)
+        before_time = time.perf_counter()
         success, errors = self._run_catch_exceptions(test, test_phase, phase_method)
-        elapsed_time = time.time() - before_time
+        elapsed_time = time.perf_counter() - before_time
         status = (
             (
                 TEST_PEND_STATUS
@@ -1231,7 +1327,7 @@ class TestScheduler(object):
             )
 
         if not success:
-            status_str += "\n    Case dir: {}\n".format(self._get_test_dir(test))
+            status_str += "\n    Case dir: {}\n".format(test_dir)
             status_str += "    Errors were:\n        {}\n".format(
                 "\n        ".join(errors.splitlines())
             )
@@ -1252,7 +1348,7 @@ class TestScheduler(object):
             append_status(
                 "Case Created using: " + " ".join(sys.argv),
                 "README.case",
-                caseroot=self._get_test_dir(test),
+                caseroot=test_dir,
             )
 
         # On batch systems, we want to immediately submit to the queue, because
@@ -1273,108 +1369,124 @@ class TestScheduler(object):
             self._update_test_status(test, RUN_PHASE, TEST_PEND_STATUS)
             self._consumer(test, RUN_PHASE, self._run_phase)
 
+    ###########################################################################
+    def _run_consumer(self, test, test_phase, phase_method):
+        ###########################################################################
+        try:
+            self._consumer(test, test_phase, phase_method)
+        except Exception:
+            # Report anything that escaped the consumer, with its traceback,
+            # the way an unhandled thread exception would be
+            logger.warning(
+                "Unexpected error for test {}:\n{}".format(test, traceback.format_exc())
+            )
+        finally:
+            self._finished_tests.put(test)
+
     ###########################################################################
     def _producer(self):
         ###########################################################################
-        threads_in_flight = {}  # test-name -> (thread, procs, phase)
-        while True:
-            work_to_do = False
-            num_threads_launched_this_iteration = 0
-            for test in self._tests:
+        threads_in_flight = {}  # test-name -> (future, procs, phase)
+        # Worker threads are reused across phases rather than spawning one
+        # thread per test phase.
+        executor = ThreadPoolExecutor(max_workers=self._parallel_jobs)
+        # Heap of (suite position, test) for tests waiting to start their next
+        # phase. Tests are always considered in suite order, so the first test
+        # of a build group starts before the rest of the group and the longest
+        # tests (see _order_tests_by_runtime) get first pick of the procs. A
+        # test is only pushed back once its current phase finishes, so tests
+        # that are done or in flight are never rescanned.
+        ready = [
+            (idx, test)
+            for test, idx in self._test_idx.items()
+            if self._work_remains(test)
+        ]
+        heapq.heapify(ready)
+        while ready or threads_in_flight:
+            blocked = []
+            while ready:
+                # If we have no workers available, stop so we can wait
+                if len(threads_in_flight) == self._parallel_jobs:
+                    break
+
+                idx, test = heapq.heappop(ready)
                 logger.debug("test_name: " + test)
 
-                if self._work_remains(test):
-                    work_to_do = True
+                test_phase, test_status = self._get_test_data(test)
+                expect(test_status != TEST_PEND_STATUS, test)
+                next_phase = self._phases[self._phase_idx[test_phase] + 1]
+                procs_needed = self._get_procs_needed(
+                    test, next_phase, threads_in_flight
+                )
 
-                    # If we have no workers available, immediately break out of loop so we can wait
-                    if len(threads_in_flight) == self._parallel_jobs:
-                        break
+                if procs_needed <= self._procs_avail:
+                    self._procs_avail -= procs_needed
 
-                    if test not in threads_in_flight:
-                        test_phase, test_status = self._get_test_data(test)
-                        expect(test_status != TEST_PEND_STATUS, test)
-                        next_phase = self._phases[self._phases.index(test_phase) + 1]
-                        procs_needed = self._get_procs_needed(
-                            test, next_phase, threads_in_flight
+                    # Necessary to print this way when multiple threads printing
+                    logger.info(
+                        "Starting {} for test {} with {:d} procs".format(
+                            next_phase, test, procs_needed
                         )
+                    )
 
-                        if procs_needed <= self._procs_avail:
-                            self._procs_avail -= procs_needed
+                    self._update_test_status(test, next_phase, TEST_PEND_STATUS)
+                    future = executor.submit(
+                        self._run_consumer,
+                        test,
+                        next_phase,
+                        self._phase_methods[next_phase],
+                    )
+                    threads_in_flight[test] = (
+                        future,
+                        procs_needed,
+                        next_phase,
+                    )
 
-                            # Necessary to print this way when multiple threads printing
-                            logger.info(
-                                "Starting {} for test {} with {:d} procs".format(
-                                    next_phase, test, procs_needed
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("  Current workload:")
+                        total_procs = 0
+                        for the_test, the_data in threads_in_flight.items():
+                            logger.debug(
+                                "    {}: {} -> {}".format(
+                                    the_test, the_data[2], the_data[1]
                                 )
                             )
+                            total_procs += the_data[1]
 
-                            self._update_test_status(test, next_phase, TEST_PEND_STATUS)
-                            new_thread = threading.Thread(
-                                target=self._consumer,
-                                args=(
-                                    test,
-                                    next_phase,
-                                    getattr(
-                                        self, "_{}_phase".format(next_phase.lower())
-                                    ),
-                                ),
-                            )
-                            threads_in_flight[test] = (
-                                new_thread,
-                                procs_needed,
-                                next_phase,
-                            )
-                            new_thread.start()
-                            num_threads_launched_this_iteration += 1
-
-                            logger.debug("  Current workload:")
-                            total_procs = 0
-                            for the_test, the_data in threads_in_flight.items():
-                                logger.debug(
-                                    "    {}: {} -> {}".format(
-                                        the_test, the_data[2], the_data[1]
-                                    )
-                                )
-                                total_procs += the_data[1]
-
-                            logger.debug(
-                                "    Total procs in use: {}".format(total_procs)
-                            )
-                        else:
-                            if not threads_in_flight:
-                                msg = "Phase '{}' for test '{}' required more processors, {:d}, than this machine can provide, {:d}".format(
-                                    next_phase, test, procs_needed, self._procs_avail
-                                )
-                                logger.warning(msg)
-                                self._update_test_status(
-                                    test, next_phase, TEST_PEND_STATUS
-                                )
-                                self._update_test_status(
-                                    test, next_phase, TEST_FAIL_STATUS
-                                )
-                                self._log_output(test, msg)
-                                if next_phase == RUN_PHASE:
-                                    self._update_test_status_file(
-                                        test, SUBMIT_PHASE, TEST_PASS_STATUS
-                                    )
-                                    self._update_test_status_file(
-                                        test, next_phase, TEST_FAIL_STATUS
-                                    )
-                                else:
-                                    self._update_test_status_file(
-                                        test, next_phase, TEST_FAIL_STATUS
-                                    )
-                                num_threads_launched_this_iteration += 1
+                        logger.debug("    Total procs in use: {}".format(total_procs))
+                elif threads_in_flight:
+                    # Try again once something in flight frees up resources
+                    blocked.append((idx, test))
+                else:
+                    msg = "Phase '{}' for test '{}' required more processors, {:d}, than this machine can provide, {:d}".format(
+                        next_phase, test, procs_needed, self._procs_avail
+                    )
+                    logger.warning(msg)
+                    self._update_test_status(test, next_phase, TEST_PEND_STATUS)
+                    self._update_test_status(test, next_phase, TEST_FAIL_STATUS)
+                    self._log_output(test, msg)
+                    if next_phase == RUN_PHASE:
+                        self._update_test_status_file(
+                            test, SUBMIT_PHASE, TEST_PASS_STATUS
+                        )
+                        self._update_test_status_file(
+                            test, next_phase, TEST_FAIL_STATUS
+                        )
+                    else:
+                        self._update_test_status_file(
+                            test, next_phase, TEST_FAIL_STATUS
+                        )
 
-            if not work_to_do:
-                break
+            for item in blocked:
+                heapq.heappush(ready, item)
 
-            if num_threads_launched_this_iteration == 0:
-                # No free resources, wait for something in flight to finish
-                self._wait_for_something_to_finish(threads_in_flight)
+            if threads_in_flight:
+                # Nothing else can start until something in flight finishes
+                for test in self._wait_for_something_to_finish(threads_in_flight):
+                    if self._work_remains(test):
+                        heapq.heappush(ready, (self._test_idx[test], test))
 
-        for unfinished_thread, _, _ in threads_in_flight.values():
-            unfinished_thread.join()
+        executor.shutdown(wait=True)
 
     ###########################################################################
     def _setup_cs_files(self):
@@ -1384,40 +1496,34 @@ class TestScheduler(object):
 
             create_cs_status(test_root=self._test_root, test_id=self._test_id)
 
-            template_file = os.path.join(template_path, "cs.submit.template")
-            template = open(template_file, "r").read()
-            setup_cmd = "./case.setup" if self._no_setup else ":"
-            build_cmd = "./case.build" if self._no_build else ":"
-            test_cmd = "./case.submit"
-            template = (
-                template.replace("<SETUP_CMD>", setup_cmd)
-                .replace("<BUILD_CMD>", build_cmd)
-                .replace("<RUN_CMD>", test_cmd)
-                .replace("<TESTID>", self._test_id)
-            )
-
+            # cs.submit is only needed if the tests will not be run here
             if self._no_run:
+                template_file = os.path.join(template_path, "cs.submit.template")
+                setup_cmd = "./case.setup" if self._no_setup else ":"
+                build_cmd = "./case.build" if self._no_build else ":"
+                test_cmd = "./case.submit"
+                template = fill_template(
+                    read_template(template_file),
+                    {
+                        "SETUP_CMD": setup_cmd,
+                        "BUILD_CMD": build_cmd,
+                        "RUN_CMD": test_cmd,
+                        "TESTID": self._test_id,
+                    },
+                )
+
                 cs_submit_file = os.path.join(
                     self._test_root, "cs.submit.{}".format(self._test_id)
                 )
-                with open(cs_submit_file, "w") as fd:
-                    fd.write(template)
-                os.chmod(
-                    cs_submit_file,
-                    os.stat(cs_submit_file).st_mode | stat.S_IXUSR | stat.S_IXGRP,
-                )
+                write_executable(cs_submit_file, template)
 
             if self._config.use_testreporter_template:
                 template_file = os.path.join(template_path, "testreporter.template")
-                template = open(template_file, "r").read()
-                template = template.replace("<PATH>", get_tools_path())
-                testreporter_file = os.path.join(self._test_root, "testreporter")
-                with open(testreporter_file, "w") as fd:
-                    fd.write(template)
-                os.chmod(
-                    testreporter_file,
-                    os.stat(testreporter_file).st_mode | stat.S_IXUSR | stat.S_IXGRP,
+                template = fill_template(
+                    read_template(template_file), {"PATH": self._tools_path}
                 )
+                testreporter_file = os.path.join(self._test_root, "testreporter")
+                write_executable(testreporter_file, template)
 
         except Exception as e:
             logger.warning("FAILED to set up cs files: {}".format(str(e)))
@@ -1438,12 +1544,14 @@ class TestScheduler(object):
 
         Return True if all tests passed.
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
 
-        # Tell user what will be run
-        logger.info("RUNNING TESTS:")
-        for test in self._tests:
-            logger.info("  {}".format(test))
+        # Tell user what will be run, in one log record rather than one per test
+        logger.info(
+            "RUNNING TESTS:\n{}".format(
+                "\n".join("  {}".format(test) for test in self._tests)
+            )
+        )
 
         # Setup cs files
         self._setup_cs_files()
@@ -1452,23 +1560,30 @@ class TestScheduler(object):
         self._producer()
         GenericXML.DISABLE_CACHING = False
 
-        expect(threading.active_count() == 1, "Leftover threads?")
+        # The producer joins its workers, anything else still alive is a bug.
+        # run_tests may itself be called from a thread other than the main one.
+        expected_threads = (threading.main_thread(), threading.current_thread())
+        leftover_threads = [
+            thread.name
+            for thread in threading.enumerate()
+            if thread not in expected_threads
+        ]
+        expect(
+            not leftover_threads,
+            "Leftover threads? {}".format(", ".join(leftover_threads)),
+        )
 
         config = Config.instance()
 
         # Copy TestStatus files to baselines for tests that have already failed.
-        if config.baseline_store_teststatus:
+        if config.baseline_store_teststatus and self._baseline_gen_name:
+            basegen_root = os.path.join(self._baseline_root, self._baseline_gen_name)
             for test in self._tests:
                 status = self._get_test_data(test)[1]
-                if (
-                    status not in [TEST_PASS_STATUS, TEST_PEND_STATUS]
-                    and self._baseline_gen_name
-                ):
-                    basegen_case_fullpath = os.path.join(
-                        self._baseline_root, self._baseline_gen_name, test
+                if status not in _CONTINUE_STATUSES:
+                    generate_teststatus(
+                        self._get_test_dir(test), os.path.join(basegen_root, test)
                     )
-                    test_dir = self._get_test_dir(test)
-                    generate_teststatus(test_dir, basegen_case_fullpath)
 
         no_need_to_wait = self._no_run or self._no_batch
         if no_need_to_wait:
@@ -1477,10 +1592,14 @@ class TestScheduler(object):
         expect_test_complete = not self._no_run and (self._no_batch or wait)
 
         logger.info("Waiting for tests to finish")
+        # The scheduler already knows where every test lives, no need to glob
+        # the (possibly shared) test root for status files
+        test_status_files = [
+            os.path.join(self._get_test_dir(test), TEST_STATUS_FILENAME)
+            for test in self._tests
+        ]
         rv = wait_for_tests(
-            glob.glob(
-                os.path.join(self._test_root, "*{}/TestStatus".format(self._test_id))
-            ),
+            [path for path in test_status_files if os.path.isfile(path)],
             no_wait=not wait,
             check_throughput=check_throughput,
             check_memory=check_memory,
@@ -1497,6 +1616,8 @@ class TestScheduler(object):
                 "To force create_test to wait for full completion, use --wait"
             )
 
-        logger.info("test-scheduler took {} seconds".format(time.time() - start_time))
+        logger.info(
+            "test-scheduler took {} seconds".format(time.perf_counter() - start_time)
+        )
 
         return rv
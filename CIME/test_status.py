@@ -302,28 +302,27 @@ class TestStatus(object):
             skip_phase_list = []
         if xfails is None:
             xfails = expected_fails.ExpectedFails()
-        result = ""
-        if self._phase_statuses:
-            for phase, data in self._phase_statuses.items():
-                if phase in skip_phase_list:
+        lines = []
+        for phase, data in self._phase_statuses.items():
+            if phase in skip_phase_list:
+                continue
+            status, comments = data
+            xfail_comment = xfails.expected_fails_comment(phase, status)
+            if skip_passes:
+                if status == TEST_PASS_STATUS and not xfail_comment:
+                    # Note that we still print the result of a PASSing test if there
+                    # is a comment related to the expected failure status. Typically
+                    # this will indicate that this is an unexpected PASS (and so
+                    # should be removed from the expected fails list).
                     continue
-                status, comments = data
-                xfail_comment = xfails.expected_fails_comment(phase, status)
-                if skip_passes:
-                    if status == TEST_PASS_STATUS and not xfail_comment:
-                        # Note that we still print the result of a PASSing test if there
-                        # is a comment related to the expected failure status. Typically
-                        # this will indicate that this is an unexpected PASS (and so
-                        # should be removed from the expected fails list).
-                        continue
-                result += "{}{} {} {}".format(prefix, status, self._test_name, phase)
-                if comments:
-                    result += " {}".format(comments)
-                if xfail_comment:
-                    result += " {}".format(xfail_comment)
-                result += "\n"
-
-        return result
+            line = "{}{} {} {}".format(prefix, status, self._test_name, phase)
+            if comments:
+                line += " {}".format(comments)
+            if xfail_comment:
+                line += " {}".format(xfail_comment)
+            lines.append(line + "\n")
+
+        return "".join(lines)
 
     def increment_non_pass_counts(self, non_pass_counts):
         """
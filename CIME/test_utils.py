@@ -2,7 +2,8 @@
 Utility functions used in test_scheduler.py, and by other utilities that need to
 get test lists.
 """
-import glob
+import glob, functools
+from concurrent.futures import ThreadPoolExecutor
 from CIME.XML.standard_module_setup import *
 from CIME.XML.testlist import Testlist
 from CIME.XML.files import Files
@@ -12,6 +13,12 @@ import CIME.utils
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=None)
+def _get_testlist(testlistfile, modtime):
+    # modtime is only part of the key so an edited testlist is read again
+    return Testlist(testlistfile)
+
+
 def get_tests_from_xml(
     xml_machine=None,
     xml_category=None,
@@ -50,8 +57,18 @@ def get_tests_from_xml(
         if os.path.isfile(test_spec_file):
             testlistfiles.append(test_spec_file)
 
-    for testlistfile in testlistfiles:
-        thistestlistfile = Testlist(testlistfile)
+    # The spec files are independent, parse (and validate) them concurrently
+    testlists = []
+    if testlistfiles:
+        with ThreadPoolExecutor(max_workers=min(8, len(testlistfiles))) as executor:
+            testlists = list(
+                executor.map(
+                    lambda path: _get_testlist(path, os.path.getmtime(path)),
+                    testlistfiles,
+                )
+            )
+
+    for testlistfile, thistestlistfile in zip(testlistfiles, testlists):
         logger.debug("Testlist file is " + testlistfile)
         logger.debug(
             "xml_machine {} xml_category {} xml_compiler {}".format(
@@ -70,7 +87,7 @@ def get_tests_from_xml(
                 compset=test["compset"],
                 machine=thismach,
                 compiler=thiscompiler,
-                testmods_string=None if "testmods" not in test else test["testmods"],
+                testmods_string=test.get("testmods"),
             )
             if driver:
                 # override default or specified driver
@@ -89,7 +106,7 @@ def get_tests_from_xml(
             logger.debug(
                 "Adding test {} with compiler {}".format(test["name"], test["compiler"])
             )
-        listoftests += newtests
+        listoftests.extend(newtests)
         logger.debug("Found {:d} tests".format(len(listoftests)))
 
     return listoftests
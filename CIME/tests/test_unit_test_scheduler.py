@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+import time
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from CIME import test_scheduler
+from CIME.test_status import (
+    TEST_PASS_STATUS,
+    TEST_FAIL_STATUS,
+    XML_PHASE,
+    SHAREDLIB_BUILD_PHASE,
+    MODEL_BUILD_PHASE,
+    SUBMIT_PHASE,
+    RUN_PHASE,
+)
+
+
+def _create_scheduler(test_root, test_names, parallel_jobs, proc_pool):
+    machobj = mock.MagicMock()
+    machobj.get_value.side_effect = lambda name, *args, **kwargs: {
+        "MAX_TASKS_PER_NODE": proc_pool,
+        "GMAKE_J": 4,
+        "CIME_OUTPUT_ROOT": test_root,
+    }.get(name)
+    machobj.has_batch_system.return_value = False
+    machobj.get_default_compiler.return_value = "gnu"
+
+    with mock.patch.object(
+        test_scheduler, "Machines", return_value=machobj
+    ), mock.patch.object(
+        test_scheduler, "get_model", return_value="cesm"
+    ), mock.patch.object(
+        test_scheduler, "get_cime_default_driver", return_value="nuopc"
+    ), mock.patch.object(
+        test_scheduler, "get_project", return_value=None
+    ), mock.patch.object(
+        test_scheduler.TestScheduler, "_get_envtest_groups", return_value=[]
+    ):
+        scheduler = test_scheduler.TestScheduler(
+            test_names,
+            test_root=test_root,
+            parallel_jobs=parallel_jobs,
+            proc_pool=proc_pool,
+            no_batch=True,
+        )
+
+    scheduler._update_test_status_file = mock.MagicMock()
+    scheduler._log_output = mock.MagicMock()
+
+    return scheduler
+
+
+def _fake_consumer(scheduler, delays):
+    started = []
+    lock = threading.Lock()
+
+    def _consumer(test, test_phase, phase_method):
+        with lock:
+            started.append((test, test_phase))
+
+        time.sleep(delays.get(test, 0))
+
+        scheduler._update_test_status(test, test_phase, TEST_PASS_STATUS)
+
+    scheduler._consumer = _consumer
+
+    return started
+
+
+class TestTestScheduler(unittest.TestCase):
+    def test_producer_build_group(self):
+        test_names = ["SMS_P1.f19_g16.A.melvin_gnu", "ERS_P1.f19_g16.A.melvin_gnu"]
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            scheduler = _create_scheduler(tempdir, test_names, 2, 8)
+
+            # Build groups follow the suite order, which may have been sorted
+            build_group = tuple(scheduler._tests)
+            first, second = build_group
+            scheduler._build_groups = [build_group]
+            scheduler._test_build_groups = {first: build_group, second: build_group}
+
+            # TOTALPES is normally read from the case
+            scheduler._total_pes = {first: 1, second: 1}
+
+            # The group's first test finishes each phase last, so the second
+            # test is always ready before the phases it has to wait for
+            started = _fake_consumer(scheduler, {first: 0.05})
+
+            scheduler._producer()
+
+        for test in (first, second):
+            assert scheduler._get_test_data(test) == (RUN_PHASE, TEST_PASS_STATUS)
+
+        for phase in (XML_PHASE, SHAREDLIB_BUILD_PHASE, MODEL_BUILD_PHASE):
+            assert started.index((first, phase)) < started.index((second, phase))
+
+        scheduler._log_output.assert_not_called()
+
+    def test_producer_procs_exceeded(self):
+        big = "SMS_P16.f19_g16.A.melvin_gnu"
+        small = "ERS_P1.f19_g16.A.melvin_gnu"
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            scheduler = _create_scheduler(tempdir, [big, small], 2, 8)
+
+            # TOTALPES is normally read from the case
+            scheduler._total_pes = {big: 16, small: 1}
+
+            started = _fake_consumer(scheduler, {})
+
+            scheduler._producer()
+
+        assert scheduler._get_test_data(big) == (RUN_PHASE, TEST_FAIL_STATUS)
+        assert scheduler._get_test_data(small) == (RUN_PHASE, TEST_PASS_STATUS)
+
+        assert (big, RUN_PHASE) not in started
+
+        scheduler._log_output.assert_called_once()
+        assert "required more processors" in scheduler._log_output.call_args[0][1]
+
+        scheduler._update_test_status_file.assert_has_calls(
+            [
+                mock.call(big, SUBMIT_PHASE, TEST_PASS_STATUS),
+                mock.call(big, RUN_PHASE, TEST_FAIL_STATUS),
+            ]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
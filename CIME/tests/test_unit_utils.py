@@ -16,6 +16,8 @@ from CIME.utils import (
     file_contains_python_function,
     copy_globs,
     import_and_run_sub_or_cmd,
+    read_template,
+    write_executable,
 )
 
 
@@ -317,6 +319,35 @@ class TestUtils(unittest.TestCase):
 
             assert module.test() == "value"
 
+    def test_read_template(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            template_file = os.path.join(tempdir, "test.template")
+            with open(template_file, "w") as fd:
+                fd.write("<TESTID>")
+
+            assert read_template(template_file) == "<TESTID>"
+
+            # Templates are only read once
+            os.remove(template_file)
+
+            assert read_template(template_file) == "<TESTID>"
+
+    def test_write_executable(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            exec_file = os.path.join(tempdir, "cs.submit")
+            with open(exec_file, "w") as fd:
+                fd.write("old contents")
+            os.chmod(exec_file, stat.S_IRUSR | stat.S_IWUSR)
+
+            write_executable(exec_file, "new contents")
+
+            with open(exec_file) as fd:
+                assert fd.read() == "new contents"
+
+            mode = os.stat(exec_file).st_mode
+            assert mode & stat.S_IXUSR
+            assert mode & stat.S_IXGRP
+
     def test_run_and_log_case_status(self):
         test_lines = [
             "00:00:00 default starting \n",
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+import unittest
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from CIME.XML import testlist as testlist_xml
+
+TESTLIST = """<?xml version="1.0"?>
+<testlist version="2.0">
+  <test name="SMS" grid="f19_g16" compset="A">
+    <machines>
+      <machine name="melvin" compiler="gnu" category="aux_cime">
+        <options>
+          <option name="wallclock">00:10</option>
+        </options>
+      </machine>
+      <machine name="mappy" compiler="intel" category="aux_cime"/>
+    </machines>
+    <options>
+      <option name="comment">test comment</option>
+    </options>
+  </test>
+</testlist>
+"""
+
+
+class TestXMLTestlist(unittest.TestCase):
+    def setUp(self):
+        # reset file caching
+        testlist_xml.Testlist._FILEMAP = {}
+
+    def test_get_tests_options(self):
+        with tempfile.TemporaryDirectory() as tdir:
+            testlist_file = Path(tdir) / "testlist.xml"
+
+            testlist_file.write_text(TESTLIST)
+
+            files = mock.MagicMock()
+            files.get_schema.return_value = None
+
+            testlist = testlist_xml.Testlist(str(testlist_file), files=files)
+
+            tests = testlist.get_tests()
+
+        assert len(tests) == 2
+
+        assert tests[0]["machine"] == "melvin"
+        assert tests[0]["options"] == {
+            "comment": "test comment",
+            "wallclock": "00:10",
+        }
+
+        # Machine specific options must not carry over to the next machine
+        assert tests[1]["machine"] == "mappy"
+        assert tests[1]["options"] == {"comment": "test comment"}
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,7 +6,7 @@ import shlex
 import configparser
 import io, logging, gzip, sys, os, time, re, shutil, glob, string, random, importlib, fnmatch
 import importlib.util
-import errno, signal, warnings, filecmp
+import errno, signal, warnings, filecmp, functools
 import stat as statlib
 from argparse import Action
 from contextlib import contextmanager
@@ -396,6 +396,49 @@ def get_template_path():
     return os.path.join(cimeroot, "CIME", "data", "templates")
 
 
+@functools.lru_cache(maxsize=None)
+def read_template(template_file):
+    """
+    Return the contents of template_file. Templates do not change while
+    running, so each one is only read once per process.
+    """
+    with open(template_file, "r") as fd:
+        return fd.read()
+
+
+_TEMPLATE_MARKER_RE = re.compile(r"<([A-Z_]+)>")
+
+
+def fill_template(template, values):
+    """
+    Replace each <NAME> marker in template with values["NAME"], in one pass.
+    Markers that are not in values are left alone.
+
+    >>> fill_template("<A> <B> <C>", {"A": "1", "B": "<A>"})
+    '1 <A> <C>'
+    """
+    return _TEMPLATE_MARKER_RE.sub(
+        lambda match: values.get(match.group(1), match.group(0)), template
+    )
+
+
+def write_executable(path, contents):
+    """
+    Write contents to path, making it executable by the user and group.
+    The permissions are set when the file is created instead of with a
+    separate stat and chmod afterwards.
+    """
+    exec_bits = statlib.S_IXUSR | statlib.S_IXGRP
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666 | exec_bits)
+    with os.fdopen(fd, "w") as fobj:
+        # An existing file keeps its old mode, make sure it can be run
+        mode = os.fstat(fd).st_mode
+        if mode & exec_bits != exec_bits:
+            os.fchmod(fd, mode | exec_bits)
+
+        fobj.write(contents)
+
+
 def get_tools_path():
     cimeroot = get_cime_root()
 
@@ -1180,9 +1223,13 @@ def get_full_test_name(
             testmods_list is None,
             "Cannot provide both testmods_list and testmods_string",
         )
-        # Convert testmods_string to testmods_list; after this point, the code will work
-        # the same regardless of whether testmods_string or testmods_list was provided.
-        testmods_list = testmods_string.split("--")
+        if partial_testmods is None:
+            # Already in the joined form, only the separators need changing
+            result += ".{}".format(testmods_string.replace("/", "-"))
+        else:
+            # Convert testmods_string to testmods_list; after this point, the code will work
+            # the same regardless of whether testmods_string or testmods_list was provided.
+            testmods_list = testmods_string.split("--")
     if partial_testmods is None:
         if testmods_list is None:
             # No testmods for this test and that's OK
@@ -18,6 +18,10 @@ SIGNAL_RECEIVED = False
 E3SM_MAIN_CDASH = "E3SM"
 CDASH_DEFAULT_BUILD_GROUP = "ACME_Latest"
 SLEEP_INTERVAL_SEC = 0.1
+# Statuses that count as a successful test
+_SUCCESS_STATUSES = frozenset([TEST_PASS_STATUS, NAMELIST_FAIL_STATUS])
+# Statuses that are not reported as a failed phase
+_NON_FAILURE_STATUSES = _SUCCESS_STATUSES | frozenset([TEST_PEND_STATUS])
 
 ###############################################################################
 def signal_handler(*_):
@@ -245,7 +249,7 @@ def create_cdash_test_xml(
 
     for test_name in sorted(results):
         test_path, test_status, _ = results[test_name]
-        test_passed = test_status in [TEST_PASS_STATUS, NAMELIST_FAIL_STATUS]
+        test_passed = test_status in _SUCCESS_STATUSES
         test_norm_path = (
             test_path if os.path.isdir(test_path) else os.path.dirname(test_path)
         )
@@ -658,6 +662,7 @@ def wait_for_tests_impl(
     ###############################################################################
     results = queue.Queue()
 
+    threads = []
     for test_path in test_paths:
         t = threading.Thread(
             target=wait_for_test,
@@ -675,9 +680,12 @@ def wait_for_tests_impl(
         )
         t.daemon = True
         t.start()
+        threads.append(t)
 
-    while threading.active_count() > 1:
-        time.sleep(1)
+    # Join rather than polling the thread count, so a run where every test
+    # is already done does not pay for a full sleep
+    for t in threads:
+        t.join()
 
     test_results = {}
     completed_test_paths = []
@@ -755,11 +763,7 @@ def wait_for_tests(
         test_path, test_status, phase = test_data
         case_dir = os.path.dirname(test_path)
 
-        if test_status not in [
-            TEST_PASS_STATUS,
-            TEST_PEND_STATUS,
-            NAMELIST_FAIL_STATUS,
-        ]:
+        if test_status not in _NON_FAILURE_STATUSES:
             # Report failed phases
             logging.info("{} {} (phase {})".format(test_status, test_name, phase))
             all_pass = False
@@ -814,7 +818,7 @@ def wait_for_tests(
                             baseline_root,
                             srcroot,
                             test_name,
-                            test_status in [TEST_PASS_STATUS, NAMELIST_FAIL_STATUS],
+                            test_status in _SUCCESS_STATUSES,
                         )
 
             except CIMEError as e: